@@ -4,17 +4,22 @@ from weather_data_processor import WeatherDataProcessor
 # Configuration parameters for data processing
 config_params = {
     "sql_query": """
-        SELECT *
+        SELECT Field_ID, Elevation, Rainfall, Ave_temps AS Temperature, Pollution_level, Crop_type, Annual_yield
         FROM geographic_features
         LEFT JOIN weather_features USING (Field_ID)
-        LEFT JOIN soil_and_crop_features USING (Field_ID)
         LEFT JOIN farm_management_features USING (Field_ID)
         """,
     "db_path": "sqlite:///farm-survey.db",
+    "chunksize": 100_000,
     "columns_to_rename": {'Annual_yield': 'Crop_type', 'Crop_type': 'Annual_yield'},
     "values_to_rename": {'cassaval': 'cassava', 'wheatn': 'wheat', 'teaa': 'tea'},
     "weather_csv_path": "https://raw.githubusercontent.com/Explore-AI/Public-Data/master/Maji_Ndogo/Weather_station_data.csv",
-    "weather_mapping_csv": "https://raw.githubusercontent.com/Explore-AI/Public-Data/master/Maji_Ndogo/Weather_data_field_mapping.csv"
+    "weather_mapping_csv": "https://raw.githubusercontent.com/Explore-AI/Public-Data/master/Maji_Ndogo/Weather_data_field_mapping.csv",
+    "regex_patterns": {
+        'Rainfall': r'(\d+(\.\d+)?)\s?mm',
+        'Temperature': r'(\d+(\.\d+)?)\s?C',
+        'Pollution_level': r'=\s*(-?\d+(\.\d+)?)|Pollution at \s*(-?\d+(\.\d+)?)'
+    }
 }
 
 def run_field_data_processing(config_params):
@@ -50,5 +55,5 @@ def run_weather_data_processing(config_params):
 """
 This script initializes and processes field data and weather data using the FieldDataProcessor and WeatherDataProcessor classes, respectively.
 It loads configuration parameters from config_params, which include SQL queries, file paths, and renaming dictionaries.
-After processing, it renames the 'Ave_temps' column in the field data DataFrame to 'Temperature' to match the weather data DataFrame.
+The SQL query only selects the columns used downstream, and aliases 'Ave_temps' to 'Temperature' to match the weather data DataFrame.
 """
@@ -5,7 +5,12 @@ This module provides functions for data ingestion from SQLite databases and web-
 """
 
 from sqlalchemy import create_engine, text
+import contextlib
+import functools
+import hashlib
 import logging
+import os
+import tempfile
 import pandas as pd
 
 # Name our logger so we know that logs from this module come from the data_ingestion module
@@ -13,12 +18,20 @@ logger = logging.getLogger('data_ingestion')
 # Set a basic logging message up that prints out a timestamp, the name of our logger, and the message
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-def create_db_engine(db_path):
+# Directory where CSV files downloaded by read_from_web_CSV are cached as Parquet
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'farm')
+
+@functools.lru_cache(maxsize=8)
+def create_db_engine(db_path, validate=False):
     """
     Creates a database engine connection using the provided database path.
 
+    Engines are cached per `db_path`, so repeated calls share one engine and its connection pool.
+
     Args:
         db_path (str): The path to the database file.
+        validate (bool, optional): Open a connection straight away to check that the database is
+            reachable. Otherwise connection errors surface on the first query. Defaults to False.
 
     Returns:
         sqlalchemy.engine.Engine: The created engine object.
@@ -29,9 +42,10 @@ def create_db_engine(db_path):
     """
     try:
         engine = create_engine(db_path)
-        # Test connection
-        with engine.connect() as conn:
-            pass
+        if validate:
+            # Test connection
+            with engine.connect() as conn:
+                pass
         # test if the database engine was created successfully
         logger.info("Database engine created successfully.")
         return engine  # Return the engine object if it all works well
@@ -42,24 +56,32 @@ def create_db_engine(db_path):
         logger.error(f"Failed to create database engine. Error: {e}")
         raise
     
-def query_data(engine, sql_query):
+def query_data(engine, sql_query, chunksize=None, connection=None):
     """
     Executes a SQL query against the provided database engine and returns the results as a Pandas DataFrame.
 
     Args:
         engine (sqlalchemy.engine.Engine): The database engine connection.
         sql_query (str): The SQL query to execute.
+        chunksize (int, optional): If given, stream the results and return an iterator of DataFrames
+            with at most this many rows each instead of a single DataFrame. Defaults to None.
+        connection (sqlalchemy.engine.Connection, optional): An open connection to run the query on,
+            so several queries can share it. It is left open and its execution options are not
+            changed, so with `chunksize` results are only streamed if the caller enabled
+            `stream_results` on it. Defaults to None, which opens and closes a connection from `engine`.
 
     Returns:
-        pandas.DataFrame: The results of the SQL query.
+        pandas.DataFrame or Iterator[pandas.DataFrame]: The results of the SQL query.
 
     Raises:
         ValueError: If the query returns an empty DataFrame.
         Exception: If there is an error executing the query.
     """
+    if chunksize is not None:
+        return _query_data_chunks(engine, sql_query, chunksize, connection)
     try:
-        with engine.connect() as connection:
-            df = pd.read_sql_query(text(sql_query), connection)
+        with _connect(engine, connection) as conn:
+            df = pd.read_sql_query(text(sql_query), conn)
         if df.empty:
             # Log a message or handle the empty DataFrame scenario as needed
             msg = "The query returned an empty DataFrame."
@@ -73,13 +95,58 @@ def query_data(engine, sql_query):
     except Exception as e:
         logger.error(f"An error occurred while querying the database. Error: {e}")
         raise e
+
+def _connect(engine, connection=None, **execution_options):
+    """
+    Returns a context manager for `connection` if given, leaving it open on exit,
+    or for a new connection from `engine` otherwise.
+
+    `execution_options` only apply to the new connection; a shared connection is used as is.
+    """
+    if connection is not None:
+        return contextlib.nullcontext(connection)
+    return engine.connect().execution_options(**execution_options)
+
+def _query_data_chunks(engine, sql_query, chunksize, connection=None):
+    """
+    Streams the results of a SQL query as DataFrames of at most `chunksize` rows.
+
+    The connection stays open until the iterator is exhausted. Connections opened here use
+    `stream_results`, so only one chunk is materialised at a time; a connection passed in by
+    the caller is streamed only if it already has that option set.
+    """
+    try:
+        with _connect(engine, connection, stream_results=True) as conn:
+            empty = True
+            for chunk in pd.read_sql_query(text(sql_query), conn, chunksize=chunksize):
+                if chunk.empty:
+                    continue
+                empty = False
+                yield chunk
+        if empty:
+            msg = "The query returned an empty DataFrame."
+            logger.error(msg)
+            raise ValueError(msg)
+        logger.info("Query executed successfully.")
+    except ValueError as e: 
+        logger.error(f"SQL query failed. Error: {e}")
+        raise e
+    except Exception as e:
+        logger.error(f"An error occurred while querying the database. Error: {e}")
+        raise e
     
-def read_from_web_CSV(URL):
+def read_from_web_CSV(URL, dtype=None):
     """
     Reads a CSV file from a web URL and returns the data as a Pandas DataFrame.
 
+    The file is parsed with the multi-threaded pyarrow CSV reader. Downloaded files are cached as
+    Parquet in CACHE_DIR and in memory for the lifetime of the process, so repeated reads of the
+    same URL skip the network. Each call returns its own copy.
+
     Args:
         URL (str): The URL of the CSV file.
+        dtype (dict, optional): A dictionary mapping column names to dtypes, which skips type inference
+            for those columns. Defaults to None.
 
     Returns:
         pandas.DataFrame: The data from the CSV file.
@@ -89,7 +156,8 @@ def read_from_web_CSV(URL):
         Exception: If there is an error reading the CSV file.
     """
     try:
-        df = pd.read_csv(URL)
+        # lru_cache needs hashable arguments, so pass the dtypes as a tuple of pairs
+        df = _read_cached_CSV(URL, tuple(dtype.items()) if dtype else None).copy()
         logger.info("CSV file read successfully from the web.")
         return df
     except pd.errors.EmptyDataError as e:
@@ -98,3 +166,53 @@ def read_from_web_CSV(URL):
     except Exception as e:
         logger.error(f"Failed to read CSV from the web. Error: {e}")
         raise e
+
+@functools.lru_cache(maxsize=None)
+def _read_cached_CSV(URL, dtype=None):
+    """
+    Reads a web CSV file through the on-disk Parquet cache, downloading it on a cache miss.
+
+    The cache file is keyed on the URL and the requested dtypes, so a different schema is never
+    served from a copy written with other dtypes.
+    """
+    cache_key = URL + repr(dtype)
+    cache_path = os.path.join(CACHE_DIR, hashlib.sha1(cache_key.encode()).hexdigest() + '.parquet')
+    if os.path.exists(cache_path):
+        try:
+            df = pd.read_parquet(cache_path)
+            logger.info(f"Read cached copy of {URL}.")
+            return df
+        except Exception as e:
+            logger.warning(f"Cached copy of {URL} is unreadable, downloading it again. Error: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(cache_path)
+    df = pd.read_csv(URL, engine='pyarrow', dtype=dict(dtype) if dtype else None)
+    try:
+        write_parquet_atomic(df, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache CSV file on disk. Error: {e}")
+    return df
+
+def write_parquet_atomic(df, path, **kwargs):
+    """
+    Writes a DataFrame to a Parquet file without ever leaving a partial file at `path`.
+
+    The data is written to a temporary file in the same directory and then moved into place,
+    so an interrupted write leaves either the old file or no file.
+
+    Args:
+        df (pandas.DataFrame): The DataFrame to write.
+        path (str): The path of the Parquet file.
+        **kwargs: Extra arguments passed to DataFrame.to_parquet.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.parquet.tmp')
+    os.close(fd)
+    try:
+        df.to_parquet(temp_path, **kwargs)
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
@@ -1,9 +1,7 @@
 import re
+import pandas as pd
 from data_ingestion import create_db_engine, query_data, read_from_web_CSV
-
-from field_data_processor import FieldDataProcessor
 import logging
-from config import config_params
 
 class FieldDataProcessor:
     """
@@ -20,14 +18,16 @@ class FieldDataProcessor:
         values_to_rename (dict): A dictionary mapping values to be renamed.
         weather_csv_path (str): The path to the weather station CSV data.
         weather_mapping_csv (str): The path to the weather station mapping CSV data.
+        chunksize (int): The number of rows to stream from the database at a time.
         df (DataFrame): The DataFrame to store processed data.
         engine: The database engine.
 
     Methods:
         initialize_logging(logging_level): Initializes logging for the class.
-        ingest_sql_data(): Ingests data from an SQL database.
+        ingest_sql_data(weather_mapping=None): Ingests data from an SQL database, renaming, correcting and mapping it chunk by chunk.
         rename_columns(): Renames columns in the DataFrame.
         apply_corrections(column_name='Crop_type', abs_column='Elevation'): Applies corrections to DataFrame columns.
+        read_weather_mapping(): Reads the weather station mapping CSV.
         weather_station_mapping(): Maps weather station data to the main DataFrame.
         process(): Calls methods to process data in sequence.
     """
@@ -46,6 +46,7 @@ class FieldDataProcessor:
         self.values_to_rename = config_params['values_to_rename']
         self.weather_csv_path = config_params['weather_csv_path']
         self.weather_mapping_csv = config_params['weather_mapping_csv']
+        self.chunksize = config_params.get('chunksize', 100_000)
         self.initialize_logging(logging_level)
         self.df = None
         self.engine = None
@@ -79,26 +80,68 @@ class FieldDataProcessor:
             ch.setFormatter(formatter)
             self.logger.addHandler(ch)
 
-    def ingest_sql_data(self):
+    def ingest_sql_data(self, weather_mapping=None):
         """
         Ingests data from an SQL database.
+
+        The query results are streamed in chunks of `chunksize` rows; each chunk is renamed,
+        downcast and corrected before the chunks are concatenated into the final DataFrame.
+
+        Args:
+            weather_mapping (DataFrame, optional): Weather station mapping to merge into each chunk
+                as it is streamed, with the same result as an outer merge on 'Field_ID'. Defaults to None.
         """
         self.engine = create_db_engine(self.db_path)
-        self.df = config_params.query_data(self.engine, self.sql_query)
+        if weather_mapping is not None:
+            # Index the mapping once and look every chunk up in that index instead of re-hashing
+            # the mapping for a merge per chunk. The lookup needs Field_ID to be unique, so check it here.
+            mapping_by_field = weather_mapping.set_index('Field_ID')
+            if not mapping_by_field.index.is_unique:
+                duplicates = mapping_by_field.index[mapping_by_field.index.duplicated()].unique().tolist()
+                raise ValueError(f"Weather station mapping has duplicate Field_IDs: {duplicates}")
+        chunks = []
+        for chunk in query_data(self.engine, self.sql_query, chunksize=self.chunksize):
+            self.df = chunk
+            self.rename_columns()
+            self._downcast()
+            self.apply_corrections()
+            if weather_mapping is not None:
+                for column in mapping_by_field.columns:
+                    self.df[column] = self.df['Field_ID'].map(mapping_by_field[column])
+            chunks.append(self.df)
+        if weather_mapping is not None:
+            # Mapped fields that never appeared in a chunk are kept, as an outer merge would
+            seen = pd.concat([chunk['Field_ID'] for chunk in chunks])
+            chunks.append(weather_mapping[~weather_mapping['Field_ID'].isin(seen)])
+        self.df = pd.concat(chunks, ignore_index=True)
+        # Categories are set after concatenating, since chunks with different categories would concat to object
+        self.df['Crop_type'] = self.df['Crop_type'].astype('category')
         self.logger.info("Sucessfully loaded data.")
         return self.df
 
+    def _downcast(self, join_keys=('Field_ID', 'Weather_station')):
+        """
+        Downcasts the numeric columns of the current chunk so the corrections and mapping that
+        follow work on narrower arrays. Join keys are kept at int32 to match the weather station
+        mapping; other columns get the smallest dtype that holds their values.
+        """
+        for column in self.df.select_dtypes(include='integer').columns:
+            if column in join_keys:
+                self.df[column] = self.df[column].astype('int32')
+            else:
+                self.df[column] = pd.to_numeric(self.df[column], downcast='integer')
+        for column in self.df.select_dtypes(include='float').columns:
+            self.df[column] = pd.to_numeric(self.df[column], downcast='float')
+
     def rename_columns(self):
         """
         Renames columns in the DataFrame.
         """
         column1, column2 = list(self.columns_to_rename.keys())[0], list(self.columns_to_rename.values())[0]
-        temp_name = "__temp_name_for_swap__"
-        while temp_name in self.df.columns:
-            temp_name += "_"
-        self.df = self.df.rename(columns={column1: temp_name, column2: column1})
-        self.df = self.df.rename(columns={temp_name: column2})
-        self.logger.info(f"Swapped columns: {column1} with {column2}")
+        # rename applies the mapping to every label at once, so both directions can go in one call
+        self.df.rename(columns={column1: column2, column2: column1}, inplace=True)
+        # Called once per streamed chunk, so keep this out of the INFO log
+        self.logger.debug(f"Swapped columns: {column1} with {column2}")
 
     def apply_corrections(self, column_name='Crop_type', abs_column='Elevation'):
         """
@@ -109,24 +152,32 @@ class FieldDataProcessor:
             abs_column (str, optional): The name of the column to take the absolute value of. Defaults to 'Elevation'.
         """
         self.df[abs_column] = self.df[abs_column].abs()
-        self.df[column_name] = self.df[column_name].apply(lambda crop: self.values_to_rename.get(crop, crop))
+        self.df[column_name] = self.df[column_name].map(self.values_to_rename).fillna(self.df[column_name])
+
+    def read_weather_mapping(self):
+        """
+        Reads the weather station mapping from a web CSV file.
+
+        Returns:
+            DataFrame: The 'Field_ID' to 'Weather_station' mapping.
+        """
+        return read_from_web_CSV(
+            self.weather_mapping_csv,
+            dtype={'Field_ID': 'int32', 'Weather_station': 'int32'},
+        )
 
     def weather_station_mapping(self):
         """
         Maps weather station data to the main DataFrame.
         """
-        self.df = self.df.merge(read_from_web_CSV(self.weather_map_data), on='Field_ID', how='outer')
+        self.df = self.df.merge(self.read_weather_mapping(), on='Field_ID', how='outer')
 
     def process(self):
         """
         Processes data by calling methods in sequence.
-        """
-        self.ingest_sql_data()
-        self.rename_columns()
-        self.apply_corrections()
-        self.weather_station_mapping()
 
-# Instantiating the FieldDataProcessor class
-field_processor = FieldDataProcessor(config_params)
-field_processor.process()
-field_df = field_processor.df
\ No newline at end of file
+        Column selection happens in the SQL query, and the rename, corrections and weather
+        station mapping are applied to each chunk as it is streamed from the database, so
+        the full result is only materialised once.
+        """
+        self.ingest_sql_data(weather_mapping=self.read_weather_mapping())
@@ -1,6 +1,43 @@
+import hashlib
+import os
 import pandas as pd
-from scipy.stats import ttest_ind
+from scipy.stats import ttest_ind, t as t_distribution
 import numpy as np
+from sqlalchemy.engine import make_url
+from config import config_params, run_field_data_processing, run_weather_data_processing
+from data_ingestion import write_parquet_atomic
+
+# Function to load processed data
+def load_processed_data(config_params, cache_dir='cache'):
+    """
+    Load the processed field and weather data, running the pipeline only if no cached copy exists.
+
+    Processed DataFrames are stored as Parquet in `cache_dir`, under names that include a hash of
+    `config_params` and the modification time of the SQLite database, so changing either re-runs
+    the pipeline. The web CSV files are not checked; delete the cache directory to pick up changes to them.
+
+    Args:
+        config_params (dict): A dictionary containing configuration parameters for data processing.
+        cache_dir (str, optional): The directory to store processed data in. Defaults to 'cache'.
+
+    Returns:
+        tuple: The processed field data and weather data DataFrames.
+    """
+    db_file = make_url(config_params['db_path']).database
+    db_mtime = os.path.getmtime(db_file) if db_file and os.path.exists(db_file) else None
+    cache_key = repr(sorted(config_params.items())) + repr(db_mtime)
+    config_hash = hashlib.sha1(cache_key.encode()).hexdigest()[:12]
+    field_path = os.path.join(cache_dir, f'field_{config_hash}.parquet')
+    weather_path = os.path.join(cache_dir, f'weather_{config_hash}.parquet')
+    if os.path.exists(field_path) and os.path.exists(weather_path):
+        return pd.read_parquet(field_path, engine='pyarrow'), pd.read_parquet(weather_path, engine='pyarrow')
+
+    field_df = run_field_data_processing(config_params)
+    weather_df = run_weather_data_processing(config_params)
+    # Written atomically so an interrupted run never leaves a truncated file that later runs would load
+    write_parquet_atomic(field_df, field_path, compression='zstd')
+    write_parquet_atomic(weather_df, weather_path, compression='zstd')
+    return field_df, weather_df
 
 # Functions for filtering data
 def filter_field_data(df, station_id, measurement):
@@ -8,14 +45,15 @@ def filter_field_data(df, station_id, measurement):
     Filter field data based on a specific weather station ID and measurement.
 
     Args:
-        df (DataFrame): The DataFrame containing field data.
+        df (DataFrame): The DataFrame containing field data, indexed and sorted by 'Weather_station'.
         station_id (int): The ID of the weather station to filter data for.
         measurement (str): The measurement to filter, such as temperature, humidity, etc.
 
     Returns:
         Series: A Series containing the filtered data for the specified weather station and measurement.
     """
-    filtered_data = df[(df['Weather_station'] == station_id)][measurement]
+    # Slicing the sorted index is a binary search rather than a scan, and returns a Series even for a single row
+    filtered_data = df.loc[station_id:station_id, measurement]
     return filtered_data
 
 def filter_weather_data(df, station_id, measurement):
@@ -23,14 +61,14 @@ def filter_weather_data(df, station_id, measurement):
     Filter weather data based on a specific weather station ID and measurement.
 
     Args:
-        df (DataFrame): The DataFrame containing weather data.
+        df (DataFrame): The DataFrame containing weather data, indexed and sorted by 'Weather_station_ID' and 'Measurement'.
         station_id (int): The ID of the weather station to filter data for.
         measurement (str): The measurement to filter, such as temperature, humidity, etc.
 
     Returns:
         Series: A Series containing the filtered data for the specified weather station and measurement.
     """
-    filtered_data = df[(df['Weather_station_ID'] == station_id) & (df['Measurement'] == measurement)]['Value']
+    filtered_data = df.loc[pd.IndexSlice[station_id:station_id, measurement:measurement], 'Value']
     return filtered_data
 
 # Function to perform t-test
@@ -45,9 +83,42 @@ def run_ttest(data1, data2):
     Returns:
         tuple: A tuple containing the t-statistic and p-value.
     """
-    t_stat, p_val = ttest_ind(data1, data2)
+    # Missing values are skipped, as they are in run_ttests
+    t_stat, p_val = ttest_ind(data1, data2, nan_policy='omit')
     return t_stat, p_val
 
+# Function to perform t-tests for several measurements at once
+def run_ttests(field_df, weather_df, station_id, measurements):
+    """
+    Perform t-tests for two independent samples for several measurements in one batch.
+
+    Group counts, means and variances are aggregated once per DataFrame, and the pooled-variance
+    t-statistics and p-values for every measurement are computed together. Missing values are
+    skipped, so the results match run_ttest, i.e. ttest_ind with nan_policy='omit'.
+
+    Args:
+        field_df (DataFrame): DataFrame containing field data, indexed and sorted by 'Weather_station'.
+        weather_df (DataFrame): DataFrame containing weather data, indexed and sorted by 'Weather_station_ID' and 'Measurement'.
+        station_id (int): The ID of the weather station to filter data for.
+        measurements (list): List of measurements to compare.
+
+    Returns:
+        tuple: Arrays of t-statistics and p-values, in the order of `measurements`.
+    """
+    field_stats = field_df.loc[station_id:station_id, measurements].agg(['count', 'mean', 'var'])
+    weather_stats = (weather_df.loc[station_id:station_id, 'Value']
+                     .groupby(level='Measurement', observed=True)
+                     .agg(['count', 'mean', 'var'])
+                     .reindex(measurements))
+
+    n1, mean1, var1 = (field_stats.loc[stat].to_numpy(dtype=float) for stat in ('count', 'mean', 'var'))
+    n2, mean2, var2 = (weather_stats[stat].to_numpy(dtype=float) for stat in ('count', 'mean', 'var'))
+    dof = n1 + n2 - 2
+    pooled_var = ((n1 - 1) * var1 + (n2 - 1) * var2) / dof
+    t_stats = (mean1 - mean2) / np.sqrt(pooled_var * (1 / n1 + 1 / n2))
+    p_vals = 2 * t_distribution.sf(np.abs(t_stats), dof)
+    return t_stats, p_vals
+
 # Function to print t-test results
 def print_ttest_results(station_id, measurement, p_val, alpha):
     """
@@ -67,28 +138,35 @@ def print_ttest_results(station_id, measurement, p_val, alpha):
         print("  Null hypothesis not rejected: There is no significant difference.")
 
 # Function to perform hypothesis testing for multiple measurements
-def hypothesis_results(field_df, weather_df, measurements_to_compare, alpha):
+def hypothesis_results(field_df, weather_df, measurements_to_compare, alpha, station_id=0):
     """
     Perform hypothesis testing for multiple measurements.
 
     Args:
-        field_df (DataFrame): DataFrame containing field data.
-        weather_df (DataFrame): DataFrame containing weather data.
+        field_df (DataFrame): DataFrame containing field data, indexed and sorted by 'Weather_station'.
+        weather_df (DataFrame): DataFrame containing weather data, indexed and sorted by 'Weather_station_ID' and 'Measurement'.
         measurements_to_compare (list): List of measurements to compare.
         alpha (float): The significance level.
+        station_id (int, optional): The ID of the weather station to test. Defaults to 0.
     """
     print("Hypothesis Testing Results:")
-    for measurement in measurements_to_compare:
-        field_values = filter_field_data(field_df, station_id, measurement)
-        weather_values = filter_weather_data(weather_df, station_id, measurement)
-        t_stat, p_val = run_ttest(field_values, weather_values)
+    t_stats, p_vals = run_ttests(field_df, weather_df, station_id, measurements_to_compare)
+    for measurement, p_val in zip(measurements_to_compare, p_vals):
         print_ttest_results(station_id, measurement, p_val, alpha)
 
 # Main function
 def main():
-    # Load your data (replace file paths with actual file paths)
-    field_df = pd.read_csv('field_data.csv')
-    weather_df = pd.read_csv('weather_data.csv')
+    # Copy-on-Write lets renames and merges in the pipeline share column data until it is
+    # modified, instead of copying every column eagerly
+    pd.set_option('mode.copy_on_write', True)
+
+    # Load the processed data, reusing the Parquet cache from a previous run when possible
+    field_df, weather_df = load_processed_data(config_params)
+
+    # Index once so every station/measurement lookup below is a sorted-index search, not a full scan.
+    # Rows without a station or measurement never match a lookup, and NaN keys would break the sort order.
+    field_df = field_df.dropna(subset=['Weather_station']).set_index('Weather_station').sort_index()
+    weather_df = weather_df.dropna(subset=['Measurement']).set_index(['Weather_station_ID', 'Measurement']).sort_index()
 
     # Set input parameters
     station_id = 0
@@ -104,7 +182,7 @@ def main():
     print_ttest_results(station_id, measurement, p_val, alpha)
 
     print("\nExample 2:")
-    hypothesis_results(field_df, weather_df, measurements_to_compare, alpha)
+    hypothesis_results(field_df, weather_df, measurements_to_compare, alpha, station_id)
 
 if __name__ == "__main__":
     main()
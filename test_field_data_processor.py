@@ -0,0 +1,31 @@
+import pandas as pd
+
+import field_data_processor
+from config import config_params
+from field_data_processor import FieldDataProcessor
+
+
+def test_process_runs_against_farm_survey_db(monkeypatch):
+    """
+    Smoke test: run the full field data pipeline on the bundled SQLite database, with the
+    weather station mapping CSV stubbed out so no network access is needed.
+    """
+    with field_data_processor.create_db_engine(config_params['db_path']).connect() as conn:
+        field_ids = pd.read_sql_query("SELECT Field_ID FROM geographic_features", conn)['Field_ID']
+    # Map every field to a station, plus one mapping-only field that must survive as an outer merge would keep it
+    mapping = pd.DataFrame({
+        'Field_ID': pd.concat([field_ids, pd.Series([-1])], ignore_index=True).astype('int32'),
+        'Weather_station': (pd.RangeIndex(len(field_ids) + 1) % 5).astype('int32'),
+    })
+    monkeypatch.setattr(field_data_processor, 'read_from_web_CSV', lambda URL, dtype=None: mapping.copy())
+
+    processor = FieldDataProcessor({**config_params, 'chunksize': 1000}, logging_level="NONE")
+    processor.process()
+    df = processor.df
+
+    assert len(df) == len(field_ids) + 1
+    assert df['Field_ID'].isin([-1]).sum() == 1
+    assert (df['Elevation'].dropna() >= 0).all()
+    assert isinstance(df['Crop_type'].dtype, pd.CategoricalDtype)
+    assert not df['Crop_type'].isin(config_params['values_to_rename']).any()
+    assert {'Weather_station', 'Temperature', 'Annual_yield'} <= set(df.columns)
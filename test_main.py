@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from main import filter_field_data, filter_weather_data, run_ttest, run_ttests
+
+
+def test_run_ttests_matches_run_ttest_with_missing_values():
+    rng = np.random.default_rng(0)
+    measurements = ['Temperature', 'Rainfall']
+    field_df = pd.DataFrame({
+        'Weather_station': np.repeat([0, 1], 20),
+        'Temperature': rng.normal(20, 2, 40),
+        'Rainfall': rng.normal(1000, 50, 40),
+    })
+    # Rows from mapping-only fields have a station but no measurements
+    field_df.loc[[3, 7], measurements] = np.nan
+    weather_df = pd.DataFrame({
+        'Weather_station_ID': np.tile(np.repeat([0, 1], 15), 2),
+        'Measurement': np.repeat(measurements, 30),
+        'Value': np.concatenate([rng.normal(21, 2, 30), rng.normal(990, 50, 30)]),
+    })
+    field_df = field_df.set_index('Weather_station').sort_index()
+    weather_df = weather_df.set_index(['Weather_station_ID', 'Measurement']).sort_index()
+
+    t_stats, p_vals = run_ttests(field_df, weather_df, 0, measurements)
+
+    for measurement, t_stat, p_val in zip(measurements, t_stats, p_vals):
+        expected_t, expected_p = run_ttest(filter_field_data(field_df, 0, measurement),
+                                           filter_weather_data(weather_df, 0, measurement))
+        assert np.isclose(t_stat, expected_t)
+        assert np.isclose(p_val, expected_p)
@@ -1,5 +1,7 @@
 import re
 import logging
+import numpy as np
+import pandas as pd
 from data_ingestion import read_from_web_CSV
 
 class WeatherDataProcessor:
@@ -13,6 +15,9 @@ class WeatherDataProcessor:
     Attributes:
         weather_station_data (str): The path to the weather station CSV data.
         patterns (dict): A dictionary containing regular expression patterns for extracting measurements from messages.
+        compiled_patterns (list): (key, re.Pattern) pairs compiled from patterns, in order.
+        measurement_pattern (re.Pattern): All patterns combined into one regular expression, tried in order.
+        value_columns (list): Positions of the groups in measurement_pattern that capture measurement values.
         weather_df (DataFrame): The DataFrame to store weather station data.
         logger: The logger object for logging messages.
     """
@@ -27,6 +32,8 @@ class WeatherDataProcessor:
         """
         self.weather_station_data = config_params['weather_csv_path']
         self.patterns = config_params['regex_patterns']
+        self.compiled_patterns = [(key, re.compile(pattern)) for key, pattern in self.patterns.items()]
+        self.measurement_pattern, self.value_columns = self.combine_patterns(self.compiled_patterns)
         self.weather_df = None
         self.initialize_logging(logging_level)
         
@@ -59,11 +66,39 @@ class WeatherDataProcessor:
             ch.setFormatter(formatter)
             self.logger.addHandler(ch)
         
+    def combine_patterns(self, compiled_patterns):
+        """
+        Combines measurement patterns into a single regular expression.
+
+        Each pattern is wrapped in a named group for its measurement key. The alternatives are
+        anchored at the start of the message so that, like searching the patterns one by one,
+        the first pattern in `compiled_patterns` that matches anywhere in a message wins.
+
+        Args:
+            compiled_patterns (list): (key, re.Pattern) pairs for each measurement, in order.
+
+        Returns:
+            tuple: The compiled combined pattern and the positions of its value groups.
+        """
+        alternatives = []
+        value_columns = []
+        position = 0
+        for key, pattern in compiled_patterns:
+            alternatives.append(f".*?(?P<{key}>{pattern.pattern})")
+            n_groups = pattern.groups
+            value_columns.extend(range(position + 1, position + 1 + n_groups))
+            position += n_groups + 1
+        return re.compile("^(?:" + "|".join(alternatives) + ")"), value_columns
+
     def weather_station_mapping(self):
         """
         Loads weather station data from a web CSV file.
         """
-        self.weather_df = read_from_web_CSV(self.weather_station_data)
+        self.weather_df = read_from_web_CSV(
+            self.weather_station_data,
+            dtype={'Weather_station_ID': 'int32', 'Message': 'string[pyarrow]'},
+        )
+        self.weather_df['Weather_station_ID'] = pd.to_numeric(self.weather_df['Weather_station_ID'], downcast='unsigned')
         self.logger.info("Successfully loaded weather station data from the web.") 
     
     def extract_measurement(self, message):
@@ -76,8 +111,8 @@ class WeatherDataProcessor:
         Returns:
             tuple: A tuple containing the measurement key and value.
         """
-        for key, pattern in self.patterns.items():
-            match = re.search(pattern, message)
+        for key, pattern in self.compiled_patterns:
+            match = pattern.search(message)
             if match:
                 self.logger.debug(f"Measurement extracted: {key}")
                 return key, float(next((x for x in match.groups() if x is not None)))
@@ -89,8 +124,20 @@ class WeatherDataProcessor:
         Processes messages in the weather station data to extract measurements.
         """
         if self.weather_df is not None:
-            result = self.weather_df['Message'].apply(self.extract_measurement)
-            self.weather_df['Measurement'], self.weather_df['Value'] = zip(*result)
+            extracted = self.weather_df['Message'].str.extract(self.measurement_pattern)
+            # Fill preallocated arrays column by column rather than building row-wise intermediates
+            codes = np.full(len(extracted), -1, dtype=np.int8)
+            for code, key in enumerate(self.patterns):
+                codes[extracted[key].notna().to_numpy()] = code
+            # Only the groups of the matching pattern are set, so the first non-null value group holds the value
+            values = np.full(len(extracted), np.nan)
+            for column in self.value_columns:
+                group = extracted.iloc[:, column]
+                found = group.notna().to_numpy() & np.isnan(values)
+                values[found] = group[found].astype(float).to_numpy()
+            # Categorical measurements make groupby hash int codes instead of strings
+            self.weather_df['Measurement'] = pd.Categorical.from_codes(codes, categories=list(self.patterns))
+            self.weather_df['Value'] = values
             self.logger.info("Messages processed and measurements extracted.")
         else:
             self.logger.warning("weather_df is not initialized, skipping message processing.")
@@ -104,7 +151,7 @@ class WeatherDataProcessor:
             DataFrame: A DataFrame containing mean values of measurements.
         """
         if self.weather_df is not None:
-            means = self.weather_df.groupby(by=['Weather_station_ID', 'Measurement'])['Value'].mean()
+            means = self.weather_df.groupby(by=['Weather_station_ID', 'Measurement'], observed=True)['Value'].mean()
             self.logger.info("Mean values calculated.")
             return means.unstack()
         else: